@@ -1,10 +1,20 @@
+import os
 import re
 import json
-from dataclasses import dataclass, asdict
-from typing import Optional, List, Dict, Tuple
+import bisect
+from dataclasses import dataclass
+from operator import attrgetter
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator
 
 import pdfplumber
 
+try:
+    import orjson  # optional: faster JSON dump
+except ImportError:
+    orjson = None
+
 GRADE_TO_POINT = {
     "A+": 4.3,
     "A": 4.0,
@@ -22,11 +32,37 @@ GRADE_TO_POINT = {
 NON_FINAL_RESULTS = {"R", "#", "W"} # Registered / Late assessment pending / Withdrawal
 NO_GRADE_RESULTS = {"RC"}  # Credit transfer without grade
 
+# result -> (status, grade_point); anything not listed is ("unknown", None)
+RESULT_CLASS: Dict[str, Tuple[str, Optional[float]]] = {
+    "": ("unknown", None),  # No result shown
+    **{g: ("included", p) for g, p in GRADE_TO_POINT.items()},  # Letter grade
+    **{r: ("excluded", None) for r in NON_FINAL_RESULTS | NO_GRADE_RESULTS},  # Non-final / no-grade transfer
+}
+
+# Letter bands for goal output, ascending by grade point (PolyU 4.3 scale)
+BAND_NAMES = ["C", "C+", "B-", "B", "B+", "A-", "A", "A+"]
+BAND_VALUES = [2.0, 2.3, 2.7, 3.0, 3.3, 3.7, 4.0, 4.3]
+
 COURSE_CODE_RE = re.compile(r"^[A-Za-z]{2,5}[A-Za-z0-9]{0,4}\d{3,5}[A-Za-z0-9]{0,3}$") #subject code ex) COMP1000, AMA1000, APSS1BN04, AF1000
 CREDIT_RE = re.compile(r"^\d+\.\d$")  # e.g., 3.0. (r"^\d+(\.\d+)?$")  
 SEM_RE = re.compile(r"^\d{4}/[12]$") #Year/Sem
-
-@dataclass
+# Whole course row in one match: CODE [TITLE] CREDIT [RESULT] [YEAR/SEM] [Y]
+# TITLE is lazy so the first credit-like token wins (title may be empty).
+# RESULT is lazy so YEAR/SEM and Y are tried first; extra tokens after RESULT are ignored.
+# Built from the token patterns above (minus their ^...$ anchors) so they stay the single source of truth.
+LINE_RE = re.compile(
+    r"^(" + COURSE_CODE_RE.pattern[1:-1] + r")"
+    r"(?:\s+(.+?))??"
+    r"\s+(" + CREDIT_RE.pattern[1:-1] + r")"
+    r"(?:\s+(\S+)(?:\s+\S+)*?)??"
+    r"(?:\s+(" + SEM_RE.pattern[1:-1] + r"))?"
+    r"(?:\s+(Y))?\s*$"
+)
+SECTION_LITERALS = {"Major/DSR": "Major/DSR", "GUR": "GUR", "LCR": "LCR"}
+SECTION_MARKER_RE = re.compile(r"\((Service Learning|LIPD|LCR-Chinese|LCR-English)\)") # group(1) is the section name
+SECTION_RE = re.compile(r"^\d+/\d+\s+(Compulsory|COMP Elective|Free elective|WIE)\b") # ex) 1/1 Compulsory 36 of 58
+
+@dataclass(slots=True, frozen=True)
 class CourseRecord:
     course_code: str
     course_title: str
@@ -38,44 +74,75 @@ class CourseRecord:
     status: str                      # included / excluded / unknown
     grade_point: Optional[float]     # None if not included
 
+    def to_dict(self) -> Dict:
+        # Same output as dataclasses.asdict, without its per-field deepcopy
+        return {
+            "course_code": self.course_code,
+            "course_title": self.course_title,
+            "credits": self.credits,
+            "result": self.result,
+            "year_sem": self.year_sem,
+            "duplicate": self.duplicate,
+            "section": self.section,
+            "status": self.status,
+            "grade_point": self.grade_point,
+        }
 
 
-def extract_text_pages(pdf_path: str) -> List[str]:
-    pages = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            pages.append(text)
-    return pages
+# Below this many pages, worker startup costs more than sequential extraction
+PARALLEL_MIN_PAGES = 8
+
+# Output order of courses[]: by section, then course_code
+COURSE_SORT_KEY = attrgetter("section", "course_code")
 
-def normalize_lines(pages_text: List[str]) -> List[str]:
-    lines: List[str] = []
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    # Worker for iter_page_text: opens the PDF once for pages [start, stop) (0-based)
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        return [page.extract_text_simple() or "" for page in pdf.pages]
+
+def iter_page_text(pdf_path: str, max_workers: Optional[int] = None) -> Iterator[str]:
+    cpus = os.cpu_count() or 1
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+        if n_pages < PARALLEL_MIN_PAGES or cpus <= 1:
+            for page in pdf.pages:
+                # Simple char-clustering path; skips extract_text's word/layout map
+                yield page.extract_text_simple() or ""
+            return
+
+    # Pages are independent: one contiguous page range per worker, map() keeps page order
+    workers = min(max_workers or cpus, n_pages)
+    chunk = -(-n_pages // workers)  # ceil division
+    starts = list(range(0, n_pages, chunk))
+    stops = [min(start + chunk, n_pages) for start in starts]
+    with ProcessPoolExecutor(max_workers=len(starts)) as ex:
+        for texts in ex.map(extract_page_range, repeat(pdf_path), starts, stops):
+            yield from texts
+
+def normalize_lines(pages_text: Iterable[str]) -> Iterator[str]:
     for text in pages_text:
         for line in text.split("\n"):
-            line = " ".join(line.split())  # collapse repeated spaces
-            if line:
-                lines.append(line)
-    return lines
+            if not line or line.isspace():  # blank line, nothing to collapse
+                continue
+            yield " ".join(line.split())  # collapse repeated spaces
 
 def detect_section(line: str, current: str) -> str:
+    # Standalone headers (Major/DSR, GUR, LCR)
+    literal = SECTION_LITERALS.get(line.strip())
+    if literal is not None:
+        return literal
+
     # Major/DSR blocks
-    if line.strip() == "Major/DSR":
-        return "Major/DSR"
-    m = re.match(r"^\d+/\d+\s+(Compulsory|COMP Elective|Free elective|WIE)\b", line)
+    m = SECTION_RE.match(line)
     if m:
         return f"{current.split(' - ')[0]} - {m.group(1)}" if "Major/DSR" in current else m.group(1)
 
-    # Standalone headers
-    if line.strip() in {"GUR", "LCR"}:
-        return line.strip()
-    if "(Service Learning)" in line:
-        return "Service Learning"
-    if "(LIPD)" in line:
-        return "LIPD"
-    if "(LCR-Chinese)" in line:
-        return "LCR-Chinese"
-    if "(LCR-English)" in line:
-        return "LCR-English"
+    # Parenthesized markers, e.g. "(LIPD)"
+    if "(" in line:
+        m = SECTION_MARKER_RE.search(line)
+        if m:
+            return m.group(1)
 
     return current
 
@@ -84,49 +151,27 @@ def parse_course_from_line(line: str, section: str) -> Optional[CourseRecord]:
     Expected (mostly):
       CODE <TITLE...> <CREDIT> <RESULT?> <YEAR/SEM?> <Y?>
     Some entries may miss RESULT and YEAR/SEM (e.g., elective list).
+    TITLE may be empty; the first credit-like token is always the credit:
+
+    >>> r = parse_course_from_line("COMP1000 3.0 A 2023/1 4.0", "GUR")
+    >>> (r.course_title, r.credits, r.result)
+    ('', 3.0, 'A')
+    >>> parse_course_from_line("AF1000 3.0 3.0", "GUR").result
+    '3.0'
     """
-    tokens = line.split()
-    if not tokens:
-        return None
-    if not COURSE_CODE_RE.match(tokens[0]):
+    # Cheap reject before the regex: course rows start with 2 letters
+    if not line[:2].isalpha():
         return None
-
-    code = tokens[0]
-    # Find credit token position (first float-like token)
-    credit_idx = None
-    for i in range(1, len(tokens)):
-        if CREDIT_RE.match(tokens[i]):
-            credit_idx = i
-            break
-    if credit_idx is None:
+    m = LINE_RE.match(line)
+    if not m:
         return None
 
-    title_tokens = tokens[1:credit_idx]
-    title = " ".join(title_tokens).strip()
-
-    credits = float(tokens[credit_idx])
-
-    # After credits: [result] [year/sem] [Y]
-    rest = tokens[credit_idx + 1 :]
-
-    result = ""
-    year_sem = ""
-    duplicate = False
-
-    if rest:
-        # Duplicate indicator can be at the very end
-        if rest[-1] == "Y":
-            duplicate = True
-            rest = rest[:-1]
-
-    # year/sem usually last (after result)
-    if rest and SEM_RE.match(rest[-1]):
-        year_sem = rest[-1]
-        rest = rest[:-1]
-
-    # remaining one token could be result/grade (A-, B+, R, RC, #, W)
-    if rest:
-        result = rest[0]
+    code, title, credit, result, year_sem, dup = m.groups()
+    title = title or ""
+    credits = float(credit)
+    result = result or ""
+    year_sem = year_sem or ""
+    duplicate = dup is not None
 
     status, gp = classify_result(result)
 
@@ -144,27 +189,11 @@ def parse_course_from_line(line: str, section: str) -> Optional[CourseRecord]:
 
 
 def classify_result(result: str) -> Tuple[str, Optional[float]]:
-    # No result shown
-    if result == "":
-        return "unknown", None
-
-    # Letter grade
-    if result in GRADE_TO_POINT:
-        return "included", GRADE_TO_POINT[result]
+    return RESULT_CLASS.get(result, ("unknown", None))
 
-    # Known non-final
-    if result in NON_FINAL_RESULTS:
-        return "excluded", None
 
-    # No-grade credit transfer
-    if result in NO_GRADE_RESULTS:
-        return "excluded", None
-
-    # Anything else (future-proof)
-    return "unknown", None
-
-
-def dedup_by_course_code(records: List[CourseRecord]) -> Tuple[List[CourseRecord], List[Dict]]:
+def dedup_by_course_code(records: List[CourseRecord],
+                         log_drops: bool = True) -> Tuple[List[CourseRecord], List[Dict]]:
     """
     Keep 1 record per course_code.
     Priority:
@@ -172,44 +201,54 @@ def dedup_by_course_code(records: List[CourseRecord]) -> Tuple[List[CourseRecord
       2) excluded (has explicit result like R/W/RC/#)
       3) unknown
     If tie, keep the one with year_sem (more informative).
+    With log_drops=False the returned log list is empty (skips building log dicts).
     """
     def score(r: CourseRecord) -> Tuple[int, int]:
         s1 = 2 if r.status == "included" else (1 if r.status == "excluded" else 0)
         s2 = 1 if r.year_sem else 0
         return (s1, s2)
 
-    chosen: Dict[str, CourseRecord] = {}
+    # course_code -> (score of kept record, kept record)
+    chosen: Dict[str, Tuple[Tuple[int, int], CourseRecord]] = {}
     dropped_logs: List[Dict] = []
 
     for r in records:
         key = r.course_code
-        if key not in chosen:
-            chosen[key] = r
+        r_score = score(r)
+        kept = chosen.get(key)
+        if kept is None:
+            chosen[key] = (r_score, r)
             continue
 
-        if score(r) > score(chosen[key]):
-            dropped_logs.append({
-                "course_code": chosen[key].course_code,
-                "dropped_section": chosen[key].section,
-                "kept_section": r.section,
-                "reason": "dedup_replaced_with_higher_priority_record"
-            })
-            chosen[key] = r
-        else:
+        kept_score, kept_rec = kept
+        if r_score > kept_score:
+            if log_drops:
+                dropped_logs.append({
+                    "course_code": kept_rec.course_code,
+                    "dropped_section": kept_rec.section,
+                    "kept_section": r.section,
+                    "reason": "dedup_replaced_with_higher_priority_record"
+                })
+            chosen[key] = (r_score, r)
+        elif log_drops:
             dropped_logs.append({
                 "course_code": r.course_code,
                 "dropped_section": r.section,
-                "kept_section": chosen[key].section,
+                "kept_section": kept_rec.section,
                 "reason": "dedup_dropped_lower_priority_record"
             })
 
-    return list(chosen.values()), dropped_logs
+    return [rec for _, rec in chosen.values()], dropped_logs
 
 
 def compute_cgpa(records: List[CourseRecord]) -> Dict:
-    included = [r for r in records if r.status == "included" and r.grade_point is not None]
-    total_credits = sum(r.credits for r in included)
-    total_gp = sum(r.credits * r.grade_point for r in included)
+    # Single pass over included records (no intermediate list)
+    total_credits = 0  # int start like sum(): no included courses -> 0, not 0.0
+    total_gp = 0
+    for r in records:
+        if r.status == "included" and r.grade_point is not None:
+            total_credits += r.credits
+            total_gp += r.credits * r.grade_point
     cgpa = (total_gp / total_credits) if total_credits > 0 else None
     return {
         "current_cgpa": None if cgpa is None else round(cgpa, 3),
@@ -228,16 +267,13 @@ def compute_goal_strategy(current_gp_sum: float, current_credits: float,
     # Convert to a rough letter-equivalent description (PolyU 4.3 scale)
     letter_equiv = None
     if required_avg is not None:
-        # find nearest band
-        # Changed: simple banding for explanation output
-        bands = [
-            ("A+", 4.3), ("A", 4.0), ("A-", 3.7),
-            ("B+", 3.3), ("B", 3.0), ("B-", 2.7),
-            ("C+", 2.3), ("C", 2.0),
-        ]
-        # find closest
-        closest = min(bands, key=lambda b: abs(b[1] - required_avg))
-        letter_equiv = f"~{closest[0]}"
+        # nearest band; on a tie prefer the higher band
+        i = bisect.bisect_left(BAND_VALUES, required_avg)
+        if i == len(BAND_VALUES) or (
+            i > 0 and required_avg - BAND_VALUES[i - 1] < BAND_VALUES[i] - required_avg
+        ):
+            i -= 1
+        letter_equiv = f"~{BAND_NAMES[i]}"
 
     return {
         "goal_cgpa": goal_cgpa,
@@ -252,17 +288,20 @@ def main():
     
     pdf_path = input("Enter the path to the PDF file (e.g., ./data/sample_transcript.pdf): ").strip()
 
-    pages = extract_text_pages(pdf_path)
-    lines = normalize_lines(pages)
+    lines = normalize_lines(iter_page_text(pdf_path))
 
     section = "UNKNOWN"
     records: List[CourseRecord] = []
 
+    # Bind hot-loop callables to locals (LOAD_FAST instead of global/attr lookups)
+    detect = detect_section
+    parse = parse_course_from_line
+    append = records.append
     for line in lines:
-        section = detect_section(line, section)
-        rec = parse_course_from_line(line, section)
+        section = detect(line, section)
+        rec = parse(line, section)
         if rec:
-            records.append(rec)
+            append(rec)
 
     deduped, dedup_logs = dedup_by_course_code(records)
 
@@ -299,13 +338,17 @@ def main():
         "grading_scale": "4.3",
         "summary": cgpa_info,
         "goal_analysis": goal,
-        "courses": [asdict(r) for r in sorted(deduped, key=lambda x: (x.section, x.course_code))],
+        "courses": [r.to_dict() for r in sorted(deduped, key=COURSE_SORT_KEY)],
         "dedup_logs": dedup_logs,
         "excluded_logs": excluded_logs,
     }
 
-    with open("transcript_parsed.json", "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        with open("transcript_parsed.json", "wb") as f:
+            f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    else:
+        with open("transcript_parsed.json", "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
 
     print("Saved: transcript_parsed.json")
     print("Current CGPA:", cgpa_info["current_cgpa"], "Credits counted:", cgpa_info["total_credits_counted"])
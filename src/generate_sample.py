@@ -7,16 +7,25 @@ output_pdf = "./data/sample_transcript.pdf"
 c = canvas.Canvas(output_pdf, pagesize=A4)
 width, height = A4
 
-y = height - 40
+def new_text():
+    # One text object per page instead of a BT/ET block per drawString
+    t = c.beginText(40, height - 40)
+    t.setFont("Helvetica", 12, leading=14)  # canvas default font, 14pt line step
+    return t
+
+t = new_text()
 
 with open(input_txt, "r", encoding="utf-8") as f:
-    for line in f:
-        if y < 40:
-            c.showPage()
-            y = height - 40
-        c.drawString(40, y, line.rstrip())
-        y -= 14
+    lines = f.read().splitlines()  # small file: read once, loop in memory
+
+for line in lines:
+    if t.getY() < 40:
+        c.drawText(t)
+        c.showPage()
+        t = new_text()
+    t.textLine(line.rstrip())
 
+c.drawText(t)
 c.save()
 
 print("Generated:", output_pdf)
\ No newline at end of file